@@ -58,6 +58,7 @@ class Camera(nn.Module):
         self.image_height = self.original_image.shape[1]
 
         self.invdepthmap = None
+        self.depth_mask = None
         self.depth_reliable = False
         if invdepthmap is not None:
             self.depth_mask = torch.ones_like(self.alpha_mask)
@@ -94,9 +94,18 @@ class GaussianModel:
         denom,
         opt_dict, 
         self.spatial_lr_scale) = model_args
+        # Checkpoints written during training hold host copies, bring them back to the GPU.
+        # The optimizer state follows its parameters in load_state_dict.
+        self._xyz = nn.Parameter(self._xyz.detach().cuda().requires_grad_(True))
+        self._features_dc = nn.Parameter(self._features_dc.detach().cuda().requires_grad_(True))
+        self._features_rest = nn.Parameter(self._features_rest.detach().cuda().requires_grad_(True))
+        self._scaling = nn.Parameter(self._scaling.detach().cuda().requires_grad_(True))
+        self._rotation = nn.Parameter(self._rotation.detach().cuda().requires_grad_(True))
+        self._opacity = nn.Parameter(self._opacity.detach().cuda().requires_grad_(True))
+        self.max_radii2D = self.max_radii2D.cuda()
         self.training_setup(training_args)
-        self.xyz_gradient_accum = xyz_gradient_accum
-        self.denom = denom
+        self.xyz_gradient_accum = xyz_gradient_accum.cuda()
+        self.denom = denom.cuda()
         self.optimizer.load_state_dict(opt_dict)
 
     @property
@@ -236,7 +245,7 @@ class GaussianModel:
             l.append('rot_{}'.format(i))
         return l
 
-    def save_ply(self, path):
+    def save_ply(self, path, executor=None):
         mkdir_p(os.path.dirname(path))
 
         xyz = self._xyz.detach().cpu().numpy()
@@ -249,11 +258,17 @@ class GaussianModel:
 
         dtype_full = [(attribute, 'f4') for attribute in self.construct_list_of_attributes()]
 
-        elements = np.empty(xyz.shape[0], dtype=dtype_full)
-        attributes = np.concatenate((xyz, normals, f_dc, f_rest, opacities, scale, rotation), axis=1)
-        elements[:] = list(map(tuple, attributes))
-        el = PlyElement.describe(elements, 'vertex')
-        PlyData([el]).write(path)
+        def write():
+            elements = np.empty(xyz.shape[0], dtype=dtype_full)
+            attributes = np.concatenate((xyz, normals, f_dc, f_rest, opacities, scale, rotation), axis=1)
+            elements[:] = list(map(tuple, attributes))
+            el = PlyElement.describe(elements, 'vertex')
+            PlyData([el]).write(path)
+
+        # The arrays above are host copies, so building and writing the file can run in the background
+        if executor is not None:
+            return executor.submit(write)
+        write()
 
     def reset_opacity(self):
         opacities_new = self.inverse_opacity_activation(torch.min(self.get_opacity, torch.ones_like(self.get_opacity)*0.01))
@@ -416,7 +431,8 @@ class GaussianModel:
                                               torch.max(self.get_scaling, dim=1).values > self.percent_dense*scene_extent)
         print(f"Old ratio split: {(selected_pts_mask.sum().item() / self.get_xyz.shape[0])*100:.4f}%")
         if gaussians_to_densify is not None:
-            selected_pts_mask[gaussians_to_densify] = True
+            # The mask predates the clones appended by densify_and_clone, which are never selected by it
+            selected_pts_mask[:gaussians_to_densify.shape[0]].logical_or_(gaussians_to_densify)
             print(f"{selected_pts_mask.sum().item()} wavelet points split")
 
         stds = self.get_scaling[selected_pts_mask].repeat(N,1)
@@ -443,7 +459,7 @@ class GaussianModel:
                                               torch.max(self.get_scaling, dim=1).values <= self.percent_dense*scene_extent)
         print(f"Old ratio clone: {(selected_pts_mask.sum().item() / self.get_xyz.shape[0])*100:.6f}%")
         if gaussians_to_densify is not None:
-            selected_pts_mask[gaussians_to_densify] = True
+            selected_pts_mask.logical_or_(gaussians_to_densify)
             print(f"{selected_pts_mask.sum().item()} wavelet points clone")
         
         new_xyz = self._xyz[selected_pts_mask]
@@ -11,16 +11,19 @@
 
 import os
 import torch
-from pytorch_wavelets import DWTForward, DWTInverse
+from utils.wavelet_utils import DWTForward, wavelet_loss_and_discrepancy, wavelet_autocast_dtype, compile_wavelet_loss
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
-from random import randint
 from utils.loss_utils import l1_loss, ssim
 from gaussian_renderer import render, network_gui
 import sys
 from scene import Scene, GaussianModel
-from utils.general_utils import safe_state, get_expon_lr_func
+from utils.general_utils import safe_state, get_expon_lr_func, snapshot_state, compact_state
+from utils.camera_utils import CameraPrefetcher
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 from utils.image_utils import psnr
 from argparse import ArgumentParser, Namespace
@@ -43,7 +46,7 @@ try:
 except:
     SPARSE_ADAM_AVAILABLE = False
 
-def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoint_iterations, checkpoint, debug_from):
+def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoint_iterations, checkpoint, debug_from, profile_grads=False, compile_wavelet=False):
 
     if not SPARSE_ADAM_AVAILABLE and opt.optimizer_type == "sparse_adam":
         sys.exit(f"Trying to use sparse adam but it is not installed, please install the correct rasterizer using pip install [3dgs_accel].")
@@ -60,16 +63,52 @@ def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoi
     bg_color = [1, 1, 1] if dataset.white_background else [0, 0, 0]
     background = torch.tensor(bg_color, dtype=torch.float32, device="cuda")
 
+    # Random backgrounds are drawn in one batch and cycled through, instead of one tiny kernel per iteration
+    bg_pool_size = 65536
+    bg_pool = torch.rand((bg_pool_size, 3), device="cuda") if opt.random_background else None
+
     iter_start = torch.cuda.Event(enable_timing = True)
     iter_end = torch.cuda.Event(enable_timing = True)
 
     use_sparse_adam = opt.optimizer_type == "sparse_adam" and SPARSE_ADAM_AVAILABLE 
     depth_l1_weight = get_expon_lr_func(opt.depth_l1_weight_init, opt.depth_l1_weight_final, max_steps=opt.iterations)
 
-    viewpoint_stack = scene.getTrainCameras().copy()
-    viewpoint_indices = list(range(len(viewpoint_stack)))
-    ema_loss_for_log = 0.0
-    ema_Ll1depth_for_log = 0.0
+    # Cameras are visited in shuffled passes, a cursor walks the permutation instead of popping from a list
+    train_cameras = scene.getTrainCameras()
+    viewpoint_perm = torch.randperm(len(train_cameras)).tolist()
+    viewpoint_cursor = 0
+    # The next camera is known ahead of time, so its images are copied while the current one trains
+    camera_prefetcher = CameraPrefetcher()
+    camera_prefetcher.prefetch(train_cameras[viewpoint_perm[viewpoint_cursor]])
+
+    # Kept on the GPU so logging does not synchronize with the device every iteration
+    ema_loss_for_log = torch.zeros((), device="cuda")
+    ema_Ll1depth_for_log = torch.zeros((), device="cuda")
+
+    # Wavelet filter banks are constant, build them once instead of every iteration
+    decomp_levels = 3
+    wavelet = 'sym4'
+    dwt = DWTForward(J=decomp_levels, wave=wavelet).cuda()
+    wavelet_dtype = wavelet_autocast_dtype()
+    wavelet_loss_fn = compile_wavelet_loss() if compile_wavelet else wavelet_loss_and_discrepancy
+
+    # Per-level wavelet weights of every iteration, built once on the GPU and indexed by iteration
+    # so the loop never uploads a weight tensor. The last level is weighted throughout densification,
+    # during its progressive phase the two finer levels are ramped up, afterwards everything is zero.
+    schedule_iters = torch.arange(opt.iterations + 1, dtype=torch.float32)
+    progress = (schedule_iters - opt.densify_from_iter) / (opt.densify_until_iter - opt.densify_from_iter)
+    ramp = (schedule_iters > opt.densify_from_iter) & (schedule_iters < opt.densify_until_iter)
+    progress = torch.where(ramp, progress, torch.zeros_like(progress))
+    wavelet_weight_schedule = torch.stack((progress * 50.0, progress * 20.0, torch.full_like(progress, 15.0)), dim=1)
+    wavelet_weight_schedule[opt.densify_until_iter + 1:] = 0.0
+    wavelet_weight_schedule = wavelet_weight_schedule.cuda()
+
+    # Disk and tensorboard writes run on a background thread so training does not wait on them
+    io_executor = ThreadPoolExecutor(max_workers=1)
+    io_futures = []
+    # Pinned host buffers of the checkpoint snapshots, reused from one checkpoint to the next
+    checkpoint_buffers = []
+    checkpoint_future = None
 
     progress_bar = tqdm(range(first_iter, opt.iterations), desc="Training progress")
     first_iter += 1
@@ -98,28 +137,34 @@ def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoi
             gaussians.oneupSHdegree()
 
         # Pick a random Camera
-        if not viewpoint_stack:
-            viewpoint_stack = scene.getTrainCameras().copy()
-            viewpoint_indices = list(range(len(viewpoint_stack)))
-        rand_idx = randint(0, len(viewpoint_indices) - 1)
-        viewpoint_cam = viewpoint_stack.pop(rand_idx)
-        vind = viewpoint_indices.pop(rand_idx)
+        viewpoint_cam = train_cameras[viewpoint_perm[viewpoint_cursor]]
+        viewpoint_cursor += 1
+        if viewpoint_cursor == len(viewpoint_perm):
+            viewpoint_perm = torch.randperm(len(train_cameras)).tolist()
+            viewpoint_cursor = 0
+        viewpoint_data = camera_prefetcher.get(viewpoint_cam)
+        camera_prefetcher.prefetch(train_cameras[viewpoint_perm[viewpoint_cursor]])
 
         # Render
         if (iteration - 1) == debug_from:
             pipe.debug = True
 
-        bg = torch.rand((3), device="cuda") if opt.random_background else background
+        if opt.random_background:
+            if iteration % bg_pool_size == 0:
+                bg_pool = torch.rand((bg_pool_size, 3), device="cuda")
+            bg = bg_pool[iteration % bg_pool_size]
+        else:
+            bg = background
 
         render_pkg = render(viewpoint_cam, gaussians, pipe, bg, use_trained_exp=dataset.train_test_exp, separate_sh=SPARSE_ADAM_AVAILABLE)
         image, viewspace_point_tensor, visibility_filter, radii, pixel_to_gaussians = render_pkg["render"], render_pkg["viewspace_points"], render_pkg["visibility_filter"], render_pkg["radii"], render_pkg["pixel_to_gaussians"]
 
-        if viewpoint_cam.alpha_mask is not None:
-            alpha_mask = viewpoint_cam.alpha_mask.cuda()
+        if viewpoint_data["alpha_mask"] is not None:
+            alpha_mask = viewpoint_data["alpha_mask"]
             image *= alpha_mask
 
         # Loss
-        gt_image = viewpoint_cam.original_image.cuda()
+        gt_image = viewpoint_data["original_image"]
 
         Ll1 = l1_loss(image, gt_image)
         if FUSED_SSIM_AVAILABLE:
@@ -127,82 +172,27 @@ def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoi
         else:
             ssim_value = ssim(image, gt_image)
 
-        wavelet_weights = [0.0, 0.0, 15.0]
-
-        if iteration > opt.densify_from_iter and iteration < opt.densify_until_iter:
-            # Progressive phase: gradually increase high-frequency weights
-            progress = (iteration - opt.densify_from_iter) / (opt.densify_until_iter - opt.densify_from_iter)
-            w_l1 = progress * 20.0
-            w_l2 = progress * 50.0
-            wavelet_weights = [w_l2, w_l1, 15.0]
-        elif iteration > opt.densify_until_iter:
-            wavelet_weights = [0.0, 0.0, 0.0]
-
-        decomp_levels = 3      
-        wavelet = 'sym4'
-        dwt = DWTForward(J=decomp_levels, wave=wavelet).cuda()
-        ifm = DWTInverse(wave=wavelet).cuda()
-
-        coeffs_rendered = dwt(image.unsqueeze(0)) # (N, C, levels, H, W)
-        coeffs_gt = dwt(gt_image.unsqueeze(0))    # (N, C, levels, H, W)
-
-        wavelet_loss = 0.0
-        _, highpass_gt = coeffs_gt
-        _, highpass_rend = coeffs_rendered
-
-        for level in range(decomp_levels):
-
-            residual_h = torch.abs(highpass_gt[level][:, :, 0] - highpass_rend[level][:, :, 0])  # LH (horizontal)
-            residual_v = torch.abs(highpass_gt[level][:, :, 1] - highpass_rend[level][:, :, 1])  # HL (vertical)
-            residual_d = torch.abs(highpass_gt[level][:, :, 2] - highpass_rend[level][:, :, 2])  # HH (diagonal)
-
-            num_coeffs = residual_d.numel()
-            norm_factor = 1.0 / torch.sqrt(torch.tensor(num_coeffs, dtype=torch.float32))
-
-            # Aggregate across channels
-            residual_h = residual_h.mean()
-            residual_v = residual_v.mean()
-            residual_d = residual_d.mean()
-
-            level_loss = (residual_h.sum() + residual_v.sum() + residual_d.sum()) * norm_factor
-
-            # Compute mean of top-k values
-            wavelet_loss += level_loss * wavelet_weights[level]
+        # Past densification all weights are zero and the coefficients are not needed,
+        # so the wavelet branch is skipped entirely
+        densify_active = opt.densify_from_iter <= iteration <= opt.densify_until_iter
+        # Candidates are only consumed by densify_and_prune and logged every 500 iterations
+        densify_step = densify_active and (iteration % 500 == 0 or (iteration > opt.densify_from_iter and iteration % opt.densification_interval == 0))
+        if iteration <= opt.densify_until_iter:
+            wavelet_loss, per_pixel_discrepancy = wavelet_loss_fn(dwt, image, gt_image, wavelet_weight_schedule[iteration], densify_step, wavelet_dtype)
+        else:
+            wavelet_loss = torch.zeros((), device="cuda")
 
         gaussians_to_densify = None
 
-        if iteration >= opt.densify_from_iter and iteration <= opt.densify_until_iter:
-            # Compute discrepancies in wavelet coefficients
-            discrepancy_coeffs = []
-            for gt_c, rend_c in zip(coeffs_gt[1], coeffs_rendered[1]):  # Iterate over levels
-                # Compute absolute differences for each high-frequency sub-band
-                discrepancy_level = torch.abs(gt_c - rend_c)  # Shape: [N, C, 3, H, W]
-                discrepancy_coeffs.append(discrepancy_level)
-
-            # Use zeros for the approximation coefficients during reconstruction
-            approx_zeros = torch.zeros_like(coeffs_gt[0])
-
-            # Reconstruct discrepancies back to pixel space
-            reconstructed_discrepancy = ifm((approx_zeros, discrepancy_coeffs))
-
-            # Sum across color channels to get per-pixel discrepancy
-            per_pixel_discrepancy = reconstructed_discrepancy.sum(dim=1) # > wavelet_threshold  # [B, H, W]
-
+        if densify_step:
             _, height, width = gt_image.shape
 
-            per_pixel_discrepancy = per_pixel_discrepancy[:,:height,:width]
-
             B, H, W = per_pixel_discrepancy.shape
-            pixel_to_gaussians = pixel_to_gaussians[:,:,:3]
+            pixel_to_gaussians = pixel_to_gaussians.narrow(2, 0, 3)
             K = pixel_to_gaussians.shape[2]
             if iteration == 500:
                 print(f"***buffer dim: {K}***")
 
-            d_max = per_pixel_discrepancy.max()
-            d_min = per_pixel_discrepancy.min()
-
-            normalized_tensor = (per_pixel_discrepancy - d_min) / (d_max - d_min)
-            
             percentile = 0.999
 
             # if 5000 <= iteration <= 7000:
@@ -212,40 +202,32 @@ def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoi
             if 7001 <= iteration <= opt.densify_until_iter:
                 percentile = 0.995
 
-            cutoff = torch.quantile(normalized_tensor.flatten(), percentile)
+            # The cutoff is the smallest of the top (1 - percentile) values, found without a full sort
+            flat_discrepancy = per_pixel_discrepancy.reshape(-1)
+            k = max(1, int(flat_discrepancy.numel() * (1 - percentile)))
+            cutoff = torch.topk(flat_discrepancy, k, sorted=False).values.min()
             discrepancy_mask = per_pixel_discrepancy > cutoff 
 
-            # discrepancy_mask = normalized_tensor > wavelet_threshold
-
-            # Flatten the masks and indices
-            high_discrepancy_mask_flat = discrepancy_mask.contiguous().view(-1)  # [B*H*W]
-            pixel_to_gaussians_flat = pixel_to_gaussians.view(-1, K)     # [B*H*W, K]
+            # Linear indices of the high discrepancy pixels
+            pix_idx = discrepancy_mask.view(-1).nonzero(as_tuple=True)[0]
 
-            # Filter indices where the pixel has high discrepancy
-            selected_gaussians = pixel_to_gaussians_flat[high_discrepancy_mask_flat]  # [N, K]
+            # Gather only the Gaussians of those pixels, the [H*W, K] view needs no copy
+            selected_gaussians = pixel_to_gaussians.flatten(0, 1).index_select(0, pix_idx)  # [N, K]
 
             # Remove invalid indices (-1)
             valid_gaussians = selected_gaussians[selected_gaussians >= 0]
 
-            # Get unique Gaussian indices
-            gaussians_to_densify = torch.unique(valid_gaussians.long())
+            # Mark the selected Gaussians in a dense mask, which deduplicates them without a sort.
+            # densify_and_prune takes the mask as is, no index list is extracted from it
+            gaussians_to_densify = torch.zeros((gaussians.get_xyz.shape[0]), dtype=torch.bool, device="cuda")
+            gaussians_to_densify[valid_gaussians.long()] = True
 
             if iteration % 500 == 0:
-                ratio = gaussians_to_densify.shape[0] / gaussians.get_xyz.shape[0]
+                ratio = gaussians_to_densify.sum().item() / gaussians.get_xyz.shape[0]
                 print(f"Affected gaussians: {ratio*100:.4f}%")
                 print(f"wavelet cutoff:{cutoff:.4f}")
-                plt.figure(figsize=(10, 10))  # Adjust the figsize to control the image size
-
-                # Plot the discrepancy mask
-                plt.imshow(discrepancy_mask.view(height, width).cpu().numpy(), cmap='hot', interpolation='nearest')
-                plt.colorbar(label="Discrepancy Intensity")
-                plt.title(f"Significant Discrepancies - Iteration {iteration}")
-
-                # Save the figure
-                plt.savefig(f"iter-{iteration}.png", dpi=300)  # Save with a high resolution if needed
-
-                # Close the figure to prevent overlap in subsequent iterations
-                plt.close()
+                # Write the raw mask, no figure or colorbar is built on the training thread
+                plt.imsave(f"iter-{iteration}.png", discrepancy_mask.view(height, width).cpu().numpy(), cmap='hot')
                 print("\nNumber of gaussians: {}".format(gaussians.get_xyz.shape[0]))
 
         L1_LOSS = (1.0 - opt.lambda_dssim) * Ll1
@@ -269,23 +251,17 @@ def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoi
 
             print(f"Relative Contributions: L1 = {L1_ratio:.2%}, SSIM = {SSIM_ratio:.2%}, Wavelet = {Wavelet_ratio:.2%}")
 
-            gaussians.optimizer.zero_grad()       
-                
-            L1_LOSS.backward(retain_graph=True)
-            L1_grad_xyz = gaussians._xyz.grad.norm().item()
-            print(f"L1 Gradient Magnitude (XYZ): {L1_grad_xyz:.6f}")
+            if profile_grads:
+                # Only the xyz gradient of each term is needed, the parameter .grad buffers are left untouched
+                L1_grad_xyz = torch.autograd.grad(L1_LOSS, gaussians._xyz, retain_graph=True)[0].norm().item()
+                print(f"L1 Gradient Magnitude (XYZ): {L1_grad_xyz:.6f}")
 
-            gaussians.optimizer.zero_grad()       
-                
-            SSIM_LOSS.backward(retain_graph=True)
-            SSIM_grad_xyz = gaussians._xyz.grad.norm().item()
-            print(f"SSIM Gradient Magnitude (XYZ): {SSIM_grad_xyz:.6f}")
+                SSIM_grad_xyz = torch.autograd.grad(SSIM_LOSS, gaussians._xyz, retain_graph=True)[0].norm().item()
+                print(f"SSIM Gradient Magnitude (XYZ): {SSIM_grad_xyz:.6f}")
 
-            gaussians.optimizer.zero_grad()       
-                
-            wavelet_loss.backward(retain_graph=True)
-            wavelet_grad_xyz = gaussians._xyz.grad.norm().item()
-            print(f"Wavelet Gradient Magnitude (XYZ): {wavelet_grad_xyz:.6f}")
+                if wavelet_loss.requires_grad:
+                    wavelet_grad_xyz = torch.autograd.grad(wavelet_loss, gaussians._xyz, retain_graph=True)[0].norm().item()
+                    print(f"Wavelet Gradient Magnitude (XYZ): {wavelet_grad_xyz:.6f}")
             print("--------------------------------------------")
             
 
@@ -293,13 +269,13 @@ def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoi
         Ll1depth_pure = 0.0
         if depth_l1_weight(iteration) > 0 and viewpoint_cam.depth_reliable:
             invDepth = render_pkg["depth"]
-            mono_invdepth = viewpoint_cam.invdepthmap.cuda()
-            depth_mask = viewpoint_cam.depth_mask.cuda()
+            mono_invdepth = viewpoint_data["invdepthmap"]
+            depth_mask = viewpoint_data["depth_mask"]
 
             Ll1depth_pure = torch.abs((invDepth  - mono_invdepth) * depth_mask).mean()
             Ll1depth = depth_l1_weight(iteration) * Ll1depth_pure 
             loss += Ll1depth
-            Ll1depth = Ll1depth.item()
+            Ll1depth = Ll1depth.detach()
         else:
             Ll1depth = 0
 
@@ -309,28 +285,33 @@ def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoi
 
         with torch.no_grad():
             # Progress bar
-            ema_loss_for_log = 0.4 * loss.item() + 0.6 * ema_loss_for_log
-            ema_Ll1depth_for_log = 0.4 * Ll1depth + 0.6 * ema_Ll1depth_for_log
+            ema_loss_for_log.mul_(0.6).add_(loss.detach(), alpha=0.4)
+            ema_Ll1depth_for_log.mul_(0.6).add_(Ll1depth, alpha=0.4)
 
+            # Timings and losses are only read back every 10 iterations, the rest of the time the GPU is never waited on
+            elapsed = None
             if iteration % 10 == 0:
-                progress_bar.set_postfix({"Loss": f"{ema_loss_for_log:.{7}f}", "Depth Loss": f"{ema_Ll1depth_for_log:.{7}f}"})
+                iter_end.synchronize()
+                elapsed = iter_start.elapsed_time(iter_end)
+                progress_bar.set_postfix({"Loss": f"{ema_loss_for_log.item():.{7}f}", "Depth Loss": f"{ema_Ll1depth_for_log.item():.{7}f}"})
                 progress_bar.update(10)
             if iteration == opt.iterations:
                 progress_bar.close()
 
             # Log and save
-            training_report(tb_writer, iteration, Ll1, loss, l1_loss, iter_start.elapsed_time(iter_end), testing_iterations, scene, render, (pipe, background, 1., SPARSE_ADAM_AVAILABLE, None, dataset.train_test_exp), dataset.train_test_exp)
+            training_report(tb_writer, iteration, Ll1, loss, l1_loss, elapsed, testing_iterations, scene, render, (pipe, background, 1., SPARSE_ADAM_AVAILABLE, None, dataset.train_test_exp), dataset.train_test_exp, io_executor, io_futures)
             if (iteration in saving_iterations):
                 print("\n[ITER {}] Saving Gaussians".format(iteration))
                 print("\nNumber of gaussians: {}".format(gaussians.get_xyz.shape[0]))
-                scene.save(iteration)
+                io_futures.append(scene.save(iteration, io_executor))
             if iteration == 15000:
                 print("\nNumber of gaussians: {}".format(gaussians.get_xyz.shape[0]))
 
             # Densification
             if iteration < opt.densify_until_iter:
                 # Keep track of max radii in image-space for pruning
-                gaussians.max_radii2D[visibility_filter] = torch.max(gaussians.max_radii2D[visibility_filter], radii[visibility_filter])
+                # Radii are zero outside the visibility filter, so a dense in-place max gives the same result without gathers
+                torch.maximum(gaussians.max_radii2D, radii, out=gaussians.max_radii2D)
                 gaussians.add_densification_stats(viewspace_point_tensor, visibility_filter)
 
                 if iteration > opt.densify_from_iter and iteration % opt.densification_interval == 0:
@@ -354,7 +335,25 @@ def training(dataset, opt, pipe, testing_iterations, saving_iterations, checkpoi
 
             if (iteration in checkpoint_iterations):
                 print("\n[ITER {}] Saving Checkpoint".format(iteration))
-                torch.save((gaussians.capture(), iteration), scene.model_path + "/chkpnt" + str(iteration) + ".pth")
+                # Host copies are taken now, serialization to disk overlaps with the next iterations.
+                # The snapshot reuses the buffers of the previous one, so that one has to be on disk first
+                if checkpoint_future is not None:
+                    checkpoint_future.result()
+                checkpoint_state = (snapshot_state(gaussians.capture(), checkpoint_buffers), iteration)
+                copies_done = torch.cuda.Event()
+                copies_done.record()
+                checkpoint_future = io_executor.submit(save_checkpoint, checkpoint_state, copies_done, scene.model_path + "/chkpnt" + str(iteration) + ".pth")
+                io_futures.append(checkpoint_future)
+
+    # Wait for pending writes and surface their errors
+    for future in io_futures:
+        future.result()
+    io_executor.shutdown()
+
+def save_checkpoint(state, copies_done, path):
+    # The host copies were issued asynchronously, wait for them before serializing
+    copies_done.synchronize()
+    torch.save(compact_state(state), path)
 
 def prepare_output_and_logger(args):    
     if not args.model_path:
@@ -378,8 +377,9 @@ def prepare_output_and_logger(args):
         print("Tensorboard not available: not logging progress")
     return tb_writer
 
-def training_report(tb_writer, iteration, Ll1, loss, l1_loss, elapsed, testing_iterations, scene : Scene, renderFunc, renderArgs, train_test_exp):
-    if tb_writer:
+def training_report(tb_writer, iteration, Ll1, loss, l1_loss, elapsed, testing_iterations, scene : Scene, renderFunc, renderArgs, train_test_exp, io_executor=None, io_futures=None):
+    # elapsed is None on iterations that are not logged, the loss tensors are not read back then
+    if tb_writer and elapsed is not None:
         tb_writer.add_scalar('train_loss_patches/l1_loss', Ll1.item(), iteration)
         tb_writer.add_scalar('train_loss_patches/total_loss', loss.item(), iteration)
         tb_writer.add_scalar('iter_time', elapsed, iteration)
@@ -414,7 +414,13 @@ def training_report(tb_writer, iteration, Ll1, loss, l1_loss, elapsed, testing_i
                     tb_writer.add_scalar(config['name'] + '/loss_viewpoint - psnr', psnr_test, iteration)
 
         if tb_writer:
-            tb_writer.add_histogram("scene/opacity_histogram", scene.gaussians.get_opacity, iteration)
+            opacity = scene.gaussians.get_opacity.detach().cpu()
+            if io_executor is not None:
+                future = io_executor.submit(tb_writer.add_histogram, "scene/opacity_histogram", opacity, iteration)
+                if io_futures is not None:
+                    io_futures.append(future)
+            else:
+                tb_writer.add_histogram("scene/opacity_histogram", opacity, iteration)
             tb_writer.add_scalar('total_points', scene.gaussians.get_xyz.shape[0], iteration)
         torch.cuda.empty_cache()
 
@@ -428,6 +434,8 @@ if __name__ == "__main__":
     parser.add_argument('--port', type=int, default=6009)
     parser.add_argument('--debug_from', type=int, default=-1)
     parser.add_argument('--detect_anomaly', action='store_true', default=False)
+    parser.add_argument('--profile_grads', action='store_true', default=False)
+    parser.add_argument('--compile_wavelet', action='store_true', default=False)
     parser.add_argument("--test_iterations", nargs="+", type=int, default=[7_000, 30_000])
     parser.add_argument("--save_iterations", nargs="+", type=int, default=[7_000, 30_000])
     parser.add_argument("--quiet", action="store_true")
@@ -446,7 +454,7 @@ if __name__ == "__main__":
     if not args.disable_viewer:
         network_gui.init(args.ip, args.port)
     torch.autograd.set_detect_anomaly(args.detect_anomaly)
-    training(lp.extract(args), op.extract(args), pp.extract(args), args.test_iterations, args.save_iterations, args.checkpoint_iterations, args.start_checkpoint, args.debug_from)
+    training(lp.extract(args), op.extract(args), pp.extract(args), args.test_iterations, args.save_iterations, args.checkpoint_iterations, args.start_checkpoint, args.debug_from, args.profile_grads, args.compile_wavelet)
 
     # All done
     print("\nTraining complete.")
@@ -9,6 +9,7 @@
 # For inquiries contact  george.drettakis@inria.fr
 #
 
+import torch
 from scene.cameras import Camera
 import numpy as np
 from utils.graphics_utils import fov2focal
@@ -94,4 +95,63 @@ def camera_to_JSON(id, camera : Camera):
         'fy' : fov2focal(camera.FovY, camera.height),
         'fx' : fov2focal(camera.FovX, camera.width)
     }
-    return camera_entry
\ No newline at end of file
+    return camera_entry
+
+class CameraPrefetcher:
+    """
+    Copies the image, mask and depth tensors of the next training camera to the GPU on a side
+    stream while the current iteration computes. Cameras kept on the CPU (--data_device cpu)
+    go through one reused set of pinned staging buffers, cameras already on the GPU are
+    returned as they are.
+    """
+    FIELDS = ("original_image", "alpha_mask", "invdepthmap", "depth_mask")
+
+    def __init__(self):
+        self.stream = torch.cuda.Stream()
+        self.staging = {}
+        self.copy_done = None
+        self.camera = None
+        self.tensors = None
+
+    def prefetch(self, camera):
+        self.camera = camera
+        self.tensors = None
+        if camera.original_image.is_cuda:
+            return
+        # The staging buffers are about to be overwritten, the previous copy out of them has to be done
+        if self.copy_done is not None:
+            self.copy_done.synchronize()
+        self.tensors = {}
+        with torch.cuda.stream(self.stream):
+            for name in self.FIELDS:
+                src = getattr(camera, name)
+                if src is None:
+                    self.tensors[name] = None
+                    continue
+                staging = self.staging.get(name)
+                if staging is None or staging.shape != src.shape or staging.dtype != src.dtype:
+                    staging = torch.empty(src.shape, dtype=src.dtype, pin_memory=True)
+                    self.staging[name] = staging
+                staging.copy_(src)
+                self.tensors[name] = staging.to("cuda", non_blocking=True)
+            self.copy_done = torch.cuda.Event()
+            self.copy_done.record(self.stream)
+
+    def get(self, camera):
+        """
+        Returns the camera's tensors on the GPU, as a dict keyed by FIELDS. Falls back to an
+        immediate copy if camera is not the one that was prefetched.
+        """
+        if camera is not self.camera:
+            self.prefetch(camera)
+        tensors, self.camera, self.tensors = self.tensors, None, None
+        if tensors is None:
+            return {name: getattr(camera, name) for name in self.FIELDS}
+        # Only the compute stream waits for the copies, not the host
+        compute_stream = torch.cuda.current_stream()
+        compute_stream.wait_stream(self.stream)
+        for tensor in tensors.values():
+            if tensor is not None:
+                # Allocated on the side stream, the memory must not be reused before the compute stream is done with it
+                tensor.record_stream(compute_stream)
+        return tensors
@@ -61,6 +61,67 @@ def get_expon_lr_func(
 
     return helper
 
+def snapshot_state(state, buffers):
+    """
+    Copies every tensor of a (nested) tuple / list / dict to page-locked host memory, so it can be
+    serialized from another thread while training keeps updating the originals in place.
+    buffers is a list holding one pinned buffer per tensor, in traversal order, and is reused
+    across snapshots: a buffer is only reallocated, with 1.5x headroom, when its tensor outgrew it.
+    Page-locked memory thus only grows while densification adds Gaussians, instead of by a full
+    copy per checkpoint (freed pinned blocks are kept by PyTorch's host allocator). The returned
+    tensors are views into the buffers, so the previous snapshot must be written before taking
+    the next one, and compact_state should be applied before torch.save.
+    The copies are issued asynchronously on the current stream: record an event afterwards and
+    synchronize on it before reading them. Parameters stay Parameters.
+    """
+    index = 0
+
+    def snapshot(value):
+        nonlocal index
+        if isinstance(value, torch.Tensor):
+            if index == len(buffers):
+                buffers.append(None)
+            buffer = buffers[index]
+            if buffer is None or buffer.dtype != value.dtype or buffer.numel() < value.numel():
+                buffer = torch.empty(max(1, int(value.numel() * 1.5)), dtype=value.dtype, pin_memory=True)
+                buffers[index] = buffer
+            index += 1
+            host_copy = buffer[:value.numel()].view(value.shape)
+            host_copy.copy_(value.detach(), non_blocking=True)
+            if isinstance(value, torch.nn.Parameter):
+                return torch.nn.Parameter(host_copy, requires_grad=value.requires_grad)
+            return host_copy
+        if isinstance(value, dict):
+            return {key: snapshot(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(snapshot(item) for item in value)
+        return value
+
+    return snapshot(state)
+
+def compact_state(state):
+    """
+    Replaces the tensors of a (nested) tuple / list / dict that only view part of their storage,
+    such as the buffers of snapshot_state, by compact copies. torch.save writes whole storages.
+    Parameters stay Parameters.
+    """
+    if isinstance(state, torch.Tensor):
+        if hasattr(state, "untyped_storage"):
+            storage_bytes = state.untyped_storage().nbytes()
+        else:
+            storage_bytes = state.storage().size() * state.element_size()
+        if storage_bytes == state.numel() * state.element_size():
+            return state
+        compact = state.detach().clone()
+        if isinstance(state, torch.nn.Parameter):
+            return torch.nn.Parameter(compact, requires_grad=state.requires_grad)
+        return compact
+    if isinstance(state, dict):
+        return {key: compact_state(value) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return type(state)(compact_state(value) for value in state)
+    return state
+
 def strip_lowerdiag(L):
     uncertainty = torch.zeros((L.shape[0], 6), dtype=torch.float, device="cuda")
 
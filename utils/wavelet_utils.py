@@ -0,0 +1,175 @@
+#
+# Copyright (C) 2023, Inria
+# GRAPHDECO research group, https://team.inria.fr/graphdeco
+# All rights reserved.
+#
+# This software is free for non-commercial, research and evaluation use
+# under the terms of the LICENSE.md file.
+#
+# For inquiries contact  george.drettakis@inria.fr
+#
+
+import math
+import contextlib
+import torch
+from torch import nn
+import torch.nn.functional as F
+
+# Decomposition low-pass filter of the sym4 wavelet (same values as pywt.Wavelet('sym4').dec_lo)
+SYM4_DEC_LO = [-0.07576571478927333, -0.02963552764599851, 0.49761866763201545, 0.8037387518059161,
+               0.29785779560527736, -0.09921954357684722, -0.012603967262037833, 0.0322231006040427]
+
+WAVELET_FILTERS = {
+    'sym4': SYM4_DEC_LO,
+}
+
+def wavelet_filters(wave):
+    """
+    Returns the (dec_lo, dec_hi) decomposition filters of an orthogonal wavelet.
+    """
+    dec_lo = torch.tensor(WAVELET_FILTERS[wave], dtype=torch.float32)
+    L = dec_lo.numel()
+    signs = torch.tensor([(-1.0) ** (k + 1) for k in range(L)])
+    dec_hi = signs * dec_lo.flip(0)
+    return dec_lo, dec_hi
+
+def _afb2d(x, h_row, h_col):
+    # One analysis level with zero padding, matching pytorch_wavelets' mode='zero'.
+    # Rows then columns are filtered by a single grouped conv each, the stride-2
+    # subsampling is folded into the conv. h_row / h_col are the banks already expanded
+    # for the C channels, [2C, 1, 1, L] and [4C, 1, L, 1].
+    C = x.shape[1]
+    L = h_row.shape[-1]
+    H, W = x.shape[-2:]
+    p_h = 2 * ((H + L - 1) // 2 - 1) - H + L
+    p_w = 2 * ((W + L - 1) // 2 - 1) - W + L
+    # Odd padding amounts get their extra sample at the bottom / right
+    x = F.pad(x, (p_w // 2, p_w // 2 + p_w % 2, p_h // 2, p_h // 2 + p_h % 2))
+
+    lohi = F.conv2d(x, h_row, stride=(1, 2), groups=C)        # [N, 2C, H', W/2]
+    y = F.conv2d(lohi, h_col, stride=(2, 1), groups=2 * C)    # [N, 4C, H/2, W/2]
+    y = y.reshape(y.shape[0], C, 4, y.shape[-2], y.shape[-1])
+    return y[:, :, 0], y[:, :, 1:]
+
+class DWTForward(nn.Module):
+    """
+    Separable 2D discrete wavelet transform built on grouped F.conv2d.
+
+    Returns (yl, yh) where yl is the [N, C, H', W'] lowpass band of the last level and
+    yh[j] holds the [N, C, 3, H_j, W_j] (LH, HL, HH) highpass bands of level j.
+    C is the number of input channels the filter banks are built for.
+    """
+    def __init__(self, J=1, wave='sym4', C=3):
+        super(DWTForward, self).__init__()
+        self.J = J
+        dec_lo, dec_hi = wavelet_filters(wave)
+        # conv2d computes a correlation, so the filters are flipped to get a convolution
+        h = torch.stack((dec_lo.flip(0), dec_hi.flip(0)))
+        # The grouped conv banks are expanded to the channel count once here, not on every call
+        self.register_buffer("h_row", h.reshape(2, 1, 1, -1).repeat(C, 1, 1, 1))
+        self.register_buffer("h_col", h.reshape(2, 1, -1, 1).repeat(2 * C, 1, 1, 1))
+
+    def forward(self, x):
+        yh = []
+        ll = x
+        for _ in range(self.J):
+            ll, highs = _afb2d(ll, self.h_row, self.h_col)
+            yh.append(highs)
+        return ll, yh
+
+def wavelet_autocast_dtype():
+    """
+    Returns the reduced precision dtype for the wavelet branch, bf16 where the GPU supports it
+    (sm_80+) and None otherwise. fp16 is not used as a fallback: without loss scaling the small,
+    size-normalized wavelet gradients would underflow.
+    """
+    return torch.bfloat16 if torch.cuda.is_bf16_supported() else None
+
+def wavelet_loss_and_discrepancy(dwt, image, gt_image, weights, compute_discrepancy, autocast_dtype=None):
+    """
+    Wavelet regularization of a rendered image against its ground truth.
+
+    weights holds one weight per decomposition level. Returns the weighted high-frequency
+    loss and, if compute_discrepancy is set, a [1, H, W] per-pixel discrepancy proxy.
+    autocast_dtype, if given, is the reduced precision the DWT and residual means run in.
+    """
+    # The wavelet terms only enter through means and a percentile, so reduced precision is enough
+    autocast = torch.autocast(device_type="cuda", dtype=autocast_dtype) if autocast_dtype is not None else contextlib.nullcontext()
+    with autocast:
+        # Rendered and GT images go through the DWT as a single batch of two
+        _, highpass = dwt(torch.stack([image, gt_image], dim=0))
+        # Channels and sub-bands are merged into one contiguous axis, (N, C, 3, H, W) -> (N, C*3, H, W)
+        highpass_rend = [h[0:1].flatten(1, 2) for h in highpass]
+        highpass_gt = [h[1:2].flatten(1, 2) for h in highpass]
+
+        # Sum of the mean absolute residuals of the (LH, HL, HH) sub-bands, normalized by the
+        # sub-band size. The sub-bands have equal sizes, so the sum is 3x the mean over all of
+        # them and each level needs a single reduction. Shapes are static, so the factors are plain floats.
+        level_losses = torch.stack([(gt_h - rend_h).abs().mean() * (3.0 / math.sqrt(gt_h.numel() // 3))
+                                    for gt_h, rend_h in zip(highpass_gt, highpass_rend)])
+
+    # Back to fp32 so the main backward stays in full precision
+    wavelet_loss = (level_losses.float() * weights).sum()
+
+    per_pixel_discrepancy = None
+    if compute_discrepancy:
+        height, width = gt_image.shape[-2:]
+        # Zero mode levels hold a few more coefficients than the image covers, padding and filter
+        # delay. Each level is cropped to the coefficients lying over the image, shifted by the
+        # delay accumulated down to that level (in coefficients of that level), so the upsampled
+        # proxy stays registered with the pixels.
+        filter_len = dwt.h_row.shape[-1]
+        delay = 0.0
+        windows = []
+        for level in range(len(highpass_gt)):
+            delay = (filter_len / 2 - 1 + delay) / 2
+            windows.append((int(delay + 0.5), -(-height // 2 ** (level + 1)), -(-width // 2 ** (level + 1))))
+
+        # Only the ordering of the per-pixel discrepancy matters for the percentile cutoff, so
+        # instead of an inverse DWT each level's high-band residual magnitude is upsampled with
+        # nearest interpolation and the levels are summed. Going from the coarsest level to the
+        # finest leaves a single full resolution resample, which lands on the image size exactly.
+        for gt_h, rend_h, (offset, rows, cols) in zip(highpass_gt[::-1], highpass_rend[::-1], windows[::-1]):
+            gt_h = gt_h[..., offset:offset + rows, offset:offset + cols]
+            rend_h = rend_h[..., offset:offset + rows, offset:offset + cols]
+            # Sum absolute differences over color channels and sub-bands
+            discrepancy_level = torch.abs(gt_h.detach() - rend_h.detach()).sum(dim=1, keepdim=True, dtype=torch.float32)  # [N, 1, H, W]
+            if per_pixel_discrepancy is not None:
+                discrepancy_level = discrepancy_level + F.interpolate(per_pixel_discrepancy, size=discrepancy_level.shape[-2:], mode='nearest')
+            per_pixel_discrepancy = discrepancy_level
+        per_pixel_discrepancy = F.interpolate(per_pixel_discrepancy, size=(height, width), mode='nearest').squeeze(1)  # [B, H, W]
+
+    return wavelet_loss, per_pixel_discrepancy
+
+def compile_wavelet_loss():
+    """
+    Returns wavelet_loss_and_discrepancy wrapped by torch.compile (PyTorch >= 2.0), which fuses the
+    element-wise ops and reductions above into a few kernels. Image sizes are fixed per scene, so
+    static shapes are used. Falls back to the eager function where dynamo is unsupported (e.g.
+    Windows or Python 3.12 on older PyTorch) and if compilation fails, which for a missing Triton
+    or C++ toolchain only happens on the first call.
+    """
+    if not hasattr(torch, "compile"):
+        return wavelet_loss_and_discrepancy
+    try:
+        import torch._dynamo
+        is_dynamo_supported = getattr(torch._dynamo, "is_dynamo_supported", None)
+        if is_dynamo_supported is not None and not is_dynamo_supported():
+            print("[Warning] torch.compile is not supported on this platform, the wavelet loss runs eagerly")
+            return wavelet_loss_and_discrepancy
+        compiled = torch.compile(wavelet_loss_and_discrepancy, dynamic=False)
+    except Exception as e:
+        print(f"[Warning] torch.compile failed ({e}), the wavelet loss runs eagerly")
+        return wavelet_loss_and_discrepancy
+
+    def compiled_or_eager(*args, **kwargs):
+        nonlocal compiled
+        if compiled is not None:
+            try:
+                return compiled(*args, **kwargs)
+            except Exception as e:
+                print(f"[Warning] torch.compile failed ({e}), the wavelet loss runs eagerly")
+                compiled = None
+        return wavelet_loss_and_discrepancy(*args, **kwargs)
+
+    return compiled_or_eager